@@ -166,7 +166,6 @@ def main():
                           ') Retrying downloading the URL: ' +
                           url)
                 else:
-                    print user_ag
                     print('(' + str(code) + ') Done downloading the URL: ' +
                           url)
                     break
@@ -86,11 +86,11 @@ def compare_scraped():
     '''intermediate function for product comparison that scrapes product asin
     and stores cookies'''
 
-    print "post request started at " + \
-        datetime.datetime.now().time().isoformat()
+    print("post request started at " +
+          datetime.datetime.now().time().isoformat())
 
-    url1 = str(request.form['url1'].encode('utf-8'))
-    url2 = str(request.form['url2'].encode('utf-8'))
+    url1 = request.form['url1']
+    url2 = request.form['url2']
 
     if not url1 or not url2:
         raise RuntimeError("No url entered")
@@ -105,8 +105,8 @@ def compare_scraped():
 
     session['products'] = [asin1, asin2]
 
-    print "post request completed at " + \
-        datetime.datetime.now().time().isoformat()
+    print("post request completed at " +
+          datetime.datetime.now().time().isoformat())
 
     return redirect(url_for('compare_results'))
 
@@ -116,11 +116,11 @@ def compare_results():
     '''runs aspect mining, sentiment analysis, and outputs final results for
     product comparison'''
 
-    print "post request started at " + \
-        datetime.datetime.now().time().isoformat()
+    print("post request started at " +
+          datetime.datetime.now().time().isoformat())
 
     try:
-        print session['products']
+        print(session['products'])
     except RuntimeError:
         return render_template('failed.html')
 
@@ -138,8 +138,8 @@ def compare_results():
         [aspectsf, aspects_pct, en_aspects, ratings, html_str, js_arr,
          img_urls, prices, titles, urls] = result
 
-        print "post request completed at " + \
-            datetime.datetime.now().time().isoformat()
+        print("post request completed at " +
+              datetime.datetime.now().time().isoformat())
 
     return render_template('compare_results.html', aspects=en_aspects,
                            aspects_f=aspectsf, aspects_pct=aspects_pct,
@@ -160,10 +160,10 @@ def summarize_scraped():
     '''intermediate function for product summarization that scrapes product
     asin and stores cookies. does not involve the use of celery'''
 
-    print "post request started at " + \
-        datetime.datetime.now().time().isoformat()
+    print("post request started at " +
+          datetime.datetime.now().time().isoformat())
 
-    url = str(request.form['url1'].encode('utf-8'))
+    url = request.form['url1']
 
     if not url:
         raise RuntimeError("No url entered")
@@ -175,8 +175,8 @@ def summarize_scraped():
 
     session['products'] = item.asin
 
-    print "post request completed at " + \
-        datetime.datetime.now().time().isoformat()
+    print("post request completed at " +
+          datetime.datetime.now().time().isoformat())
 
     return redirect(url_for('summarize_results'))
 
@@ -185,11 +185,11 @@ def summarize_scraped():
 def summarize_results():
     '''runs aspect mining, sentiment analysis, and outputs final results for
     product summarization. does not involve the use of celery'''
-    print "post request started at " + \
-        datetime.datetime.now().time().isoformat()
+    print("post request started at " +
+          datetime.datetime.now().time().isoformat())
     
     try:
-        print session['products']
+        print(session['products'])
     except RuntimeError:
         return render_template('failed.html')
 
@@ -203,8 +203,8 @@ def summarize_results():
     [aspectsf, aspects_pct, en_aspects, ratings, html_str, js_arr,
      img_urls, prices, titles, urls] = result
 
-    print "post request completed at " + \
-        datetime.datetime.now().time().isoformat()
+    print("post request completed at " +
+          datetime.datetime.now().time().isoformat())
 
     return render_template('summarize_results.html', aspects=en_aspects,
                            aspects_f=aspectsf, aspects_pct=aspects_pct,
@@ -87,7 +87,7 @@ def product_info(polarizer, head=0):
 
     try:
         img = soup.find("div", {"id": "imgTagWrapperId"}).find("img")
-        img_url = json.loads(img["data-a-dynamic-image"]).keys()[0]
+        img_url = next(iter(json.loads(img["data-a-dynamic-image"])))
 
         price = soup.find("span", {"id": "priceblock_ourprice"})
         if not price:
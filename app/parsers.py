@@ -94,7 +94,7 @@ class ReviewSents(object):
                 review = parser(review)
                 n_reviews += 1
             except AssertionError:
-                print 'parser for review #{} failed'.format(i)
+                print('parser for review #{} failed'.format(i))
                 continue
 
             for sent in review.sents:
@@ -363,7 +363,7 @@ class Bigramer(object):
 
         feats = Counter(self._get_compactness_feat(corpus))
 
-        for (key, val) in feats.iteritems():
+        for (key, val) in feats.items():
             order = sorted(key.split(" "),
                            reverse=self.ordering[key][1] >
                            self.ordering[key][0])
@@ -156,8 +156,8 @@ class Polarizer(object):
         aspect_idx = self.aspect_dict[aspect][review]['first_aspect_idx']
         rating = self.aspect_dict[aspect][review]['rating']
         review_txt = self.aspect_dict[aspect][review]['sentences']
-        review_txt = unicodedata.normalize('NFKD', review_txt).encode('ascii',
-                                                                      'ignore')
+        review_txt = unicodedata.normalize('NFKD', review_txt) \
+            .encode('ascii', 'ignore').decode('ascii')
         pol_blob = round(TextBlob(review_txt).sentiment.polarity, 3)
 
         if rating == 5 and pol_blob > 0.1:
@@ -337,7 +337,7 @@ class Polarizer(object):
                 while len(frag) > max_txt_len:
                     chars = txt.split(" ")
 
-                    lst = map(len, chars)
+                    lst = [len(char) for char in chars]
                     lst = np.hstack([0, np.cumsum(lst)])
                     lst = np.arange(lst.shape[0]) + lst
 
@@ -356,6 +356,6 @@ class Polarizer(object):
             big_str += (' ' * max_txt_len + '\n') * (total_lines + 1)
 
         if printing:
-            print big_str
+            print(big_str)
         else:
             return big_str
@@ -2,7 +2,7 @@
 Adds sample data from the sample_results.html page to MongoDB.
 '''
 from pymongo import MongoClient
-import cPickle
+import pickle
 
 
 def store_sample_data():
@@ -14,7 +14,8 @@ def store_sample_data():
     tab = db['review_data']
 
     with open('../data/sample_data.pkl', 'rb') as f:
-        sample_data = cPickle.load(f)
+        # pickled under python 2, its str values are plain ascii
+        sample_data = pickle.load(f, encoding='latin1')
 
     for asin in sample_data:
         for i, (auth, head, rate, revw) in enumerate(zip(*sample_data[asin])):
@@ -4,13 +4,159 @@ HTML files offline, stores review data into mongodb, and creates Loader objects
 for use with the SentCustomProperties class of functions in parsers.py
 '''
 
-from bs4 import BeautifulSoup
-from pymongo import MongoClient
-import math
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from lxml import html
+from lxml.etree import XPath
+from pymongo import MongoClient, UpdateOne
+import logging
+import numpy as np
 import os
+import pandas as pd
+import pymongo
 import re
+import subprocess
+import sys
+import threading
 import time
 
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    # Not on Linux or package missing, fall back to polling
+    INotify = None
+
+_log = logging.getLogger(__name__)
+
+if not pymongo.has_c():
+    _log.warning("pymongo C extensions are unavailable, review upserts "
+                 "will be BSON encoded in pure Python")
+
+_ASIN_RE = re.compile(r'(?<=/)[^/]*')
+_RATING_RE = re.compile(r'\d')
+_CRAWL_TIMEOUT = 900
+_POLL_INTERVAL = 10
+_WATCH_TIMEOUT = 15000
+_MAX_WORKERS = 8
+_CLIENT = None
+
+# Parsers are kept per thread: lxml serializes parses that share a parser
+_PARSERS = threading.local()
+
+# Compiled once and evaluated in C against raw lxml trees. smart_strings is
+# off so the returned strings don't keep a reference to the parsed page.
+_NAME = XPath("string((//*[contains(concat(' ', @class, ' '), "
+              "' a-link-normal ')])[1])", smart_strings=False)
+_REV_CNT = XPath("string(//span[@class='a-size-medium totalReviewCount'])",
+                 smart_strings=False)
+_REVIEW_BLOCKS = XPath("//div[@class='a-section review']")
+_RATING = XPath("string(.//i)", smart_strings=False)
+_REVIEW = XPath("string(.//span[@class='a-size-base review-text'])",
+                smart_strings=False)
+_AUTHOR = XPath("string(.//a[@class='a-size-base a-link-normal author'])",
+                smart_strings=False)
+_HEADLINE = XPath("string(.//a[@class='a-size-base a-link-normal "
+                  "review-title a-color-base a-text-bold'])",
+                  smart_strings=False)
+
+
+def _html_parser():
+    '''
+    INPUT: None
+    OUTPUT: HTMLParser
+
+    Returns the calling thread's html parser. The crawler always writes utf8
+    and pages don't reliably declare a charset, so the encoding is pinned
+    rather than left to libxml2's guess.
+    '''
+    parser = getattr(_PARSERS, 'parser', None)
+
+    if parser is None:
+        parser = _PARSERS.parser = html.HTMLParser(encoding='utf-8')
+
+    return parser
+
+
+def _get_client():
+    '''
+    INPUT: None
+    OUTPUT: MongoClient
+
+    Returns the MongoClient shared by every Loader in the process, creating
+    it and the review_data asin index on first use.
+    '''
+    global _CLIENT
+
+    if _CLIENT is None:
+        client = MongoClient(maxPoolSize=16)
+        # Only cache the client once the index exists, so a failed call
+        # (e.g. mongod still starting) is retried on the next use
+        client['ars']['review_data'].create_index('asin')
+        _CLIENT = client
+
+    return _CLIENT
+
+
+@lru_cache(maxsize=32)
+def _read_first_page(path, mtime):
+    '''
+    INPUT: str, int
+    OUTPUT: str, str
+
+    Args:
+        path: path of the first stored review html file of a product
+        mtime: modification time of the file, so a rescraped page is reparsed
+
+    Returns the product name and the raw total review count text. Cached so
+    scrape and extract only parse the page once.
+    '''
+    with open(path, 'rb') as f:
+        tree = html.parse(f, parser=_html_parser())
+
+    return _NAME(tree), _REV_CNT(tree)
+
+
+def _first_page(path):
+    '''
+    INPUT: str
+    OUTPUT: str, str
+
+    Args:
+        path: path of the first stored review html file of a product
+
+    Returns the product name and raw total review count text of the page.
+    '''
+    return _read_first_page(path, os.stat(path).st_mtime_ns)
+
+
+def _parse_page(path):
+    '''
+    INPUT: str
+    OUTPUT: list
+
+    Args:
+        path: path of a stored amazon review html file
+
+    Returns a list of (rating, review, author, headline) tuples, one per
+    review on the page. Touches no shared state so that pages can be parsed
+    concurrently.
+    '''
+    tags = _REVIEW_BLOCKS(html.parse(path, parser=_html_parser()))
+
+    if not tags:
+        _log.warning('%s is an invalid page format for scraping', path)
+
+    records = []
+
+    for tag in tags:
+        rating = int(_RATING_RE.search(_RATING(tag)).group())
+        author = _AUTHOR(tag) or "Anonymous"
+        headline = _HEADLINE(tag) or "No headline"
+
+        records.append((rating, _REVIEW(tag), author, headline))
+
+    return records
+
 
 class Loader(object):
     '''
@@ -28,13 +174,17 @@ class Loader(object):
             headlines (list): list of strings of review headlines
             name (str): custom name for Amazon product
             ratings (list): list of ints of review ratings
+            ratings_arr (np.array): int8 array of review ratings
             reviews (list): list of strings of review text
+            reviews_arr (pd.StringArray): string array of review text
             url (str): url of the amazon link to scrape (required for scraping)
         '''
         self.asin = None
         self.name = name
         self.ratings = None
+        self.ratings_arr = None
         self.reviews = None
+        self.reviews_arr = None
         self.url = url
 
     def _get_id(self, url):
@@ -49,12 +199,11 @@ class Loader(object):
         '''
 
         # url format: https://www.amazon.com/.../.../id/...
-        regex = re.compile(r'(?<=/)[^/]*')
-        asin = regex.findall(url)[-2]
+        asin = _ASIN_RE.findall(url)[-2]
 
         if len(asin) != 10:
             # url format https://www.amazon.com/.../id
-            asin = regex.findall(url)[-1][:10]
+            asin = _ASIN_RE.findall(url)[-1][:10]
 
         self.asin = asin
 
@@ -63,18 +212,15 @@ class Loader(object):
         Deletes folder with preexisting review html data for asin
         '''
         path = os.getcwd() + '/reviews/com/{}/'.format(self.asin)
-        pages = [file_ for file_ in os.listdir(path)]
 
         try:
-            for page in pages:
-                os.remove(path + page)
-        except:
-            print 'No files to delete!'
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    os.unlink(entry.path)
 
-        try:
             os.rmdir(path)
-        except:
-            print 'No folder to delete!'
+        except FileNotFoundError:
+            _log.warning('No folder to delete!')
 
     def _get_html_count(self, folder):
         '''
@@ -86,7 +232,9 @@ class Loader(object):
 
         Returns a count of the number of html files inside specified folder
         '''
-        return len([htm for htm in os.listdir(folder) if htm[-4:] == 'html'])
+        with os.scandir(folder) as entries:
+            return sum(1 for e in entries
+                       if e.is_file() and e.name.endswith('.html'))
 
     def scrape(self, n_reviews=300, delete=False, retries=0):
         '''
@@ -103,7 +251,8 @@ class Loader(object):
         '''
         try:
             self._get_id(self.url)
-        except:
+        except (IndexError, TypeError):
+            # url is missing or has too few path segments
             raise RuntimeError("Cannot find asin from the url.")
 
         folder = os.getcwd() + '/reviews/com/' + self.asin
@@ -111,10 +260,10 @@ class Loader(object):
         if delete:
             self._delete()
 
-        if 'amazon_crawler.py' in os.listdir(os.getcwd()):
-            cmd = 'python amazon_crawler.py'
-        elif 'amazon_crawler.py' in os.listdir(os.getcwd() + '/scripts'):
-            cmd = 'python scripts/amazon_crawler.py'
+        if os.path.isfile('amazon_crawler.py'):
+            crawler = 'amazon_crawler.py'
+        elif os.path.isfile('scripts/amazon_crawler.py'):
+            crawler = 'scripts/amazon_crawler.py'
         else:
             raise RuntimeError("Put amazon_crawler.py in same folder as "
                                "current working directory or inside scripts"
@@ -124,36 +273,66 @@ class Loader(object):
             # Run Amazon scraper
             # Credit to Andrea Esuli
             # https://github.com/aesuli/amadown2py
+            args = [sys.executable, crawler, '-d', 'com', self.asin,
+                    '-m', str(n_reviews), '-o', 'reviews']
+            proc = subprocess.Popen(args)
+
             try:
-                os.system('{} -d com {} -m {} -o reviews'
-                          .format(cmd, self.asin, n_reviews))
-                last_page = self._get_html_count(folder)
-            except NameError:
+                proc.wait(timeout=_CRAWL_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                # Keep whatever pages were saved, the retry logic below
+                # decides whether they are enough
+                proc.kill()
+                proc.wait()
+
+            if not os.path.isdir(folder):
                 raise RuntimeError("Invalid ASIN")
+
+            last_page = self._get_html_count(folder)
         else:
             # Check to see if number of html files is sufficient
             new_files = True
-            rev_cnt_tag = "a-size-medium totalReviewCount"
 
-            with open('{}/{}_1.html'.format(folder, self.asin), 'r') as f:
-                soup = BeautifulSoup(f, 'html.parser')
+            first = '{}/{}_1.html'.format(folder, self.asin)
+            name, rev_cnt = _first_page(first)
+            reviews = int(rev_cnt.replace(',', ''))
 
-            tag = soup.find("span", {"class": rev_cnt_tag})
-            reviews = int(tag.text.replace(',', ''))
-            expected_pages = min(int(math.ceil(n_reviews / 10.)),
-                                 int(math.ceil(reviews / 10.)))
+            if not self.name:
+                # Saves extract from parsing the first page again
+                self.name = name
 
-            last_page = self._get_html_count(folder)
+            expected_pages = min(-(-n_reviews // 10), -(-reviews // 10))
+
+            watcher = None
 
-            while last_page != expected_pages and new_files:
-                # Wait for background scraping to complete
-                time.sleep(10)
-                old_count = last_page
+            if INotify is not None:
+                # Watch before counting so no page written in between is lost
+                watcher = INotify()
+                watcher.add_watch(folder, flags.CLOSE_WRITE)
+
+            try:
                 last_page = self._get_html_count(folder)
 
-                if old_count == last_page:
-                    # No background scraping
-                    new_files = False
+                while last_page != expected_pages and new_files:
+                    # Wait for background scraping to complete, waking as
+                    # soon as the crawler finishes writing a page
+                    if watcher is not None:
+                        # Any event means the crawler is alive, even if the
+                        # page it closed was already counted; only a timeout
+                        # with no events means nothing is scraping
+                        new_files = bool(watcher.read(timeout=_WATCH_TIMEOUT))
+                        last_page = self._get_html_count(folder)
+                    else:
+                        time.sleep(_POLL_INTERVAL)
+                        old_count = last_page
+                        last_page = self._get_html_count(folder)
+
+                        if old_count == last_page:
+                            # No background scraping
+                            new_files = False
+            finally:
+                if watcher is not None:
+                    watcher.close()
 
             if last_page != expected_pages and not new_files:
                 # Not enough files, delete files and force rescrape in the
@@ -183,9 +362,10 @@ class Loader(object):
 
         Extracts the star rating, review text, author name, and review headline
         from directory of amazon html files and stores to MongoDB. Full lists
-        of rating and review data are stored as lists in the Loader object.
+        of rating and review data are stored as lists in the Loader object,
+        along with column arrays of the same data.
         '''
-        client = MongoClient()
+        client = _get_client()
         db = client['ars']
         tab = db['review_data']
         index = 0
@@ -195,59 +375,43 @@ class Loader(object):
 
         if not self.name:
             f = os.getcwd() + '/reviews/com/{0}/{0}_1.html'.format(self.asin)
+            self.name = _first_page(f)[0]
 
-            with open(f, 'r') as html:
-                soup = BeautifulSoup(html, 'html.parser')
-
-            try:
-                self.name = soup.select('.a-link-normal')[0].text
-            except:
+            if not self.name:
                 raise RuntimeError("Invalid HTML code")
 
         path = os.getcwd() + '/reviews/com/{}/'.format(self.asin)
-        pages = [file_ for file_ in os.listdir(path) if file_[-5:] == '.html']
-        ratings, reviews = [], []
-
-        for page in pages:
-            with open(path + page, 'r') as f:
-                soup = BeautifulSoup(f, 'html.parser')
-                tags = soup.findAll("div", {"class": "a-section review"})
-
-                if not tags:
-                    print '{} is an invalid page format for scraping' \
-                        .format(page)
-                    continue
-
-                for tag in tags:
+        ratings, reviews, ops = [], [], []
+        ratings_append, reviews_append = ratings.append, reviews.append
+        ops_append = ops.append
+
+        # Worker threads are only started as pages are submitted
+        with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor, \
+                os.scandir(path) as entries:
+            pages = (e.path for e in entries if e.name.endswith('.html'))
+
+            # map keeps page order so review indexes match the serial order
+            for records in executor.map(_parse_page, pages):
+                for rating, review, author, headline in records:
                     _id = "{}_{}".format(self.asin, index)
-                    r_class = "a-size-base review-text"
-                    a_class = "a-size-base a-link-normal author"
-                    h_class = "a-size-base a-link-normal review-title " \
-                        "a-color-base a-text-bold"
-
-                    rating = int(tag.find('i').text[0])
-                    review = tag.findAll("span", {"class": r_class})[0].text
-
-                    try:
-                        author = tag.findAll("a", {"class": a_class})[0].text
-                    except:
-                        author = "Anonymous"
-                    try:
-                        headline = tag.findAll("a", {"class": h_class})[0].text
-                    except:
-                        headline = "No headline"
-
-                    ratings.append(rating)
-                    reviews.append(review)
+
+                    ratings_append(rating)
+                    reviews_append(review)
 
                     data = {'asin': self.asin, 'review_idx': index,
                             'rating': rating, 'review': review,
                             'author': author, 'headline': headline}
 
-                    tab.update_one({'_id': _id}, {'$set': data},
-                                   upsert=True)
+                    ops_append(UpdateOne({'_id': _id}, {'$set': data},
+                                         upsert=True))
 
                     index += 1
 
+        if ops:
+            tab.bulk_write(ops, ordered=False)
+
         self.ratings, self.reviews = ratings, reviews
+        self.ratings_arr = np.fromiter(ratings, dtype=np.int8,
+                                       count=len(ratings))
+        self.reviews_arr = pd.array(reviews, dtype='string')
         return self
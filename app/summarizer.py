@@ -50,7 +50,7 @@ def common_features(polarizer1, polarizer2, min_pct=0.03, n=10, printing=True):
     output = comm_aspects.values[:, 0:3]
 
     if printing:
-        print output[0:n]
+        print(output[0:n])
 
     return output[:, 0:3], output[:, 0].tolist()
 
@@ -93,7 +93,7 @@ def print_aspect_summary(aspect_list, polarizer1, polarizer2, line_len=115):
 
         big_str += comb_str + '\n'
 
-    print big_str
+    print(big_str)
 
 
 def _html_coder(ai, pi, ci, cat, dic, asin, max_txt_len, curr_str):
@@ -121,7 +121,7 @@ def _html_coder(ai, pi, ci, cat, dic, asin, max_txt_len, curr_str):
         while len(frag) > max_txt_len:
             chars = txt.split(" ")
 
-            lst = map(len, chars)
+            lst = [len(char) for char in chars]
             lst = np.hstack([0, np.cumsum(lst)])
             lst = np.arange(lst.shape[0]) + lst
 